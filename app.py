@@ -1,10 +1,25 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
+import asyncio
+import functools
 import json
-import plotly.express as px
-import google.generativeai as genai
+import hashlib
+import socket
+import threading
+import time
+import re
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
+from typing import Iterator, List, Tuple, Union
+
+class LLMProviderError(Exception):
+    """Raised by streaming calls, which run off the script thread and so cannot report via st.error"""
 
 # Abstract base class for LLM providers
 class LLMProvider(ABC):
@@ -12,30 +27,166 @@ class LLMProvider(ABC):
     def generate_response(self, prompt: str) -> str:
         pass
 
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        # Fallback for providers without native streaming: yield the whole response at once
+        response = self.generate_response(prompt)
+        if response:
+            yield response
+
+    async def generate_response_async(self, prompt: str) -> str:
+        # Fallback for providers without a native async client: run the blocking call in a worker thread
+        return await asyncio.to_thread(self.generate_response, prompt)
+
+    def close(self):
+        # Releases any connections the provider holds; called when the session switches provider
+        pass
+
+# The non-streaming call only gets a reply once the whole answer is generated, so the read timeout
+# has to cover a full generation; connecting to the local server should be near-instant
+OLLAMA_ASYNC_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+
+class OllamaStream:
+    """Iterator over a streaming Ollama response whose close() is safe to call from another thread"""
+    def __init__(self, session: requests.Session, url: str, payload: dict):
+        self.session = session
+        self.url = url
+        self.payload = payload
+        self.response = None
+        self.closed = False
+        self._lock = threading.Lock()
+        self._chunks = self._iter_chunks()
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        return next(self._chunks)
+    
+    def _iter_chunks(self) -> Iterator[str]:
+        try:
+            with self.session.post(self.url, json=self.payload, stream=True) as response:
+                with self._lock:
+                    self.response = response
+                    if self.closed:
+                        return
+                response.raise_for_status()
+                # Ollama streams newline-delimited JSON objects, one per generated chunk
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        raise LLMProviderError(f"Ollama returned an error: {chunk['error']}")
+                    if chunk.get('response'):
+                        yield chunk['response']
+                    if chunk.get('done'):
+                        break
+        except requests.exceptions.RequestException as e:
+            raise LLMProviderError(f"Error connecting to Ollama: {str(e)}") from e
+        except ValueError as e:
+            raise LLMProviderError(f"Invalid response from Ollama: {str(e)}") from e
+    
+    def close(self):
+        with self._lock:
+            self.closed = True
+            response = self.response
+        if response is not None:
+            # Closing the response alone does not wake a thread blocked in recv() (e.g. during a
+            # long prefill), so shut the socket down to make that read fail right away
+            connection = getattr(response.raw, 'connection', None)
+            sock = getattr(connection, 'sock', None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            response.close()
+        try:
+            self._chunks.close()
+        except ValueError:
+            # The worker is still inside the generator; the aborted read ends it instead
+            pass
+
 class OllamaProvider(LLMProvider):
-    def __init__(self, model: str = "llama2"):
+    def __init__(self, model: str = "llama2", keep_alive: str = "30m"):
         self.model = model
+        # How long Ollama keeps the model loaded after a request, avoiding a cold reload on the next click
+        self.keep_alive = keep_alive
         self.url = "http://localhost:11434/api/generate"
+        # Reuse pooled keep-alive connections instead of opening a new socket per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def generate_response(self, prompt: str) -> str:
         payload = {
             "model": self.model,
             "prompt": prompt,
+            "keep_alive": self.keep_alive,
             "stream": False
         }
         
         try:
-            response = requests.post(self.url, json=payload)
+            response = self.session.post(self.url, json=payload)
             response.raise_for_status()
             return response.json()['response']
         except requests.exceptions.RequestException as e:
             st.error(f"Error connecting to Ollama: {str(e)}")
             return None
 
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "keep_alive": self.keep_alive,
+            "stream": True
+        }
+        return OllamaStream(self.session, self.url, payload)
+
+    async def generate_response_async(self, prompt: str) -> str:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "keep_alive": self.keep_alive,
+            "stream": False
+        }
+        
+        try:
+            async with httpx.AsyncClient(timeout=OLLAMA_ASYNC_TIMEOUT) as client:
+                response = await client.post(self.url, json=payload)
+                response.raise_for_status()
+                return response.json()['response']
+        except httpx.HTTPError as e:
+            raise LLMProviderError(f"Error connecting to Ollama: {str(e)}") from e
+        except (KeyError, ValueError) as e:
+            raise LLMProviderError(f"Invalid response from Ollama: {str(e)}") from e
+
+    def close(self):
+        self.session.close()
+
+@functools.lru_cache(maxsize=4)
+def _get_gemini_client_manager(api_key: str):
+    # A private client manager per key: the SDK's global clients (genai.configure) are shared by
+    # every session, so a model relying on them could send requests under another user's key.
+    # Imported here so Ollama-only sessions never pay for loading the Gemini SDK.
+    from google.generativeai import client
+    manager = client._ClientManager()
+    manager.configure(api_key=api_key)
+    return manager
+
+@functools.lru_cache(maxsize=4)
+def _get_gemini_model(api_key: str, model_name: str):
+    import google.generativeai as genai
+    model = genai.GenerativeModel(model_name)
+    # Bind the sync client up front so the model never picks up the global one on first use
+    model._client = _get_gemini_client_manager(api_key).make_client("generative")
+    return model
+
 class GeminiProvider(LLMProvider):
     def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.api_key = api_key
+        self.model = _get_gemini_model(api_key, 'gemini-pro')
     
     def generate_response(self, prompt: str) -> str:
         try:
@@ -45,32 +196,179 @@ class GeminiProvider(LLMProvider):
             st.error(f"Error connecting to Gemini: {str(e)}")
             return None
 
-class DataAnalyzer:
-    def __init__(self, df: pd.DataFrame, llm_provider: LLMProvider):
-        self.df = df
-        self.llm_provider = llm_provider
+    def generate_response_stream(self, prompt: str) -> Iterator[str]:
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                # Checked first: chunk.parts itself raises when there are no candidates
+                if not chunk.candidates:
+                    reason = chunk.prompt_feedback.block_reason.name
+                    raise LLMProviderError(f"Gemini blocked the prompt: {reason}")
+                if chunk.parts:
+                    yield chunk.text
+                    continue
+                # A candidate without text parts means generation stopped, e.g. a safety block
+                reason = chunk.candidates[0].finish_reason
+                if reason.name != "STOP":
+                    raise LLMProviderError(f"Gemini stopped the response: {reason.name}")
+        except LLMProviderError:
+            raise
+        except Exception as e:
+            raise LLMProviderError(f"Error connecting to Gemini: {str(e)}") from e
+
+    async def generate_response_async(self, prompt: str) -> str:
+        try:
+            if self.model._async_client is None:
+                # Created on the shared event loop (see run_coroutine), which the grpc.aio client binds to
+                self.model._async_client = _get_gemini_client_manager(self.api_key).make_client("generative_async")
+            response = await self.model.generate_content_async(prompt)
+            return response.text
+        except Exception as e:
+            raise LLMProviderError(f"Error connecting to Gemini: {str(e)}") from e
+
+# Demographic columns always stored as categories; other text columns are converted when they
+# have few enough distinct values for int8 codes
+CATEGORICAL_COLUMNS = ['Gender', 'Party']
+CATEGORY_MAX_VALUES = 127
+
+def factorize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Categories are sorted and ordered so the codes are stable for a given set of values
+    for i, name in enumerate(df.columns):
+        column = df.iloc[:, i]
+        if isinstance(column.dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(column.dtype):
+            continue
+        # All-empty columns (null[pyarrow] from the pyarrow engine) cannot become categoricals
+        if column.isna().all():
+            continue
+        if name in CATEGORICAL_COLUMNS or column.nunique() <= CATEGORY_MAX_VALUES:
+            df.isetitem(i, column.astype('category').cat.as_ordered())
+    return df
+
+def dedupe_columns(columns) -> List[str]:
+    # The pyarrow engine keeps repeated headers as-is; rename them the way the default parser
+    # does ('a', 'a.1', 'a.2', ...) so every column can be selected by name
+    seen = set()
+    result = []
+    for name in map(str, columns):
+        candidate, n = name, 0
+        while candidate in seen:
+            n += 1
+            candidate = f"{name}.{n}"
+        seen.add(candidate)
+        result.append(candidate)
+    return result
+
+# Shared by every session, so bound it: each entry is a whole parsed frame
+@st.cache_data(hash_funcs={UploadedFile: lambda f: f.getvalue()}, max_entries=8, ttl=3600)
+def load_csv(uploaded_file: UploadedFile) -> pd.DataFrame:
+    uploaded_file.seek(0)
+    try:
+        # Arrow's multithreaded parser, keeping Arrow-backed columns for the downstream summaries
+        df = pd.read_csv(uploaded_file, engine='pyarrow', dtype_backend='pyarrow')
+        df.columns = dedupe_columns(df.columns)
+    except (ImportError, ValueError, pd.errors.ParserError):
+        # pyarrow is missing or stricter than the default parser (e.g. ragged rows)
+        uploaded_file.seek(0)
+        df = pd.read_csv(uploaded_file)
+    return factorize_columns(df)
+
+# Caps on how much of the dataset is pasted into each prompt
+SUMMARY_MAX_COLUMNS = 20
+SAMPLE_ROWS = 3
+
+def select_summary_columns(df: pd.DataFrame, limit: int = SUMMARY_MAX_COLUMNS) -> List[str]:
+    if len(df.columns) <= limit:
+        return list(df.columns)
     
-    def generate_analysis_prompt(self, question: str, context: str = None) -> str:
-        df_info = f"Dataset Summary:\n"
-        df_info += f"Columns: {', '.join(self.df.columns)}\n"
-        df_info += f"Total Rows: {len(self.df)}\n\n"
-        
-        df_info += "Statistical Summary:\n"
-        df_info += self.df.describe().to_string()
-        
-        df_info += "\n\nSample Data:\n"
-        df_info += self.df.head().to_string()
-        
-        prompt = f"""You are a data analyst examining political survey data. Here's the context:
+    # Demographic columns are always kept; the rest of the budget goes to the most variable
+    # numeric columns (by coefficient of variation)
+    keep = [c for c in CATEGORICAL_COLUMNS if c in df.columns]
+    budget = max(limit - len(keep), 0)
+    numeric = df.select_dtypes(include='number').drop(columns=keep, errors='ignore')
+    if numeric.empty:
+        ranked = [c for c in df.columns if c not in keep][:budget]
+    else:
+        cv = (numeric.std() / numeric.mean().abs()).astype(float).replace([np.inf, -np.inf], np.nan)
+        ranked = list(cv.nlargest(budget).index) or list(numeric.columns[:budget])
+    
+    selected = set(keep) | set(ranked)
+    return [c for c in df.columns if c in selected]
+
+def _describe_numeric(numeric: pd.DataFrame) -> str:
+    try:
+        import polars as pl
+    except ImportError:
+        return numeric.describe().to_string()
+    
+    # Polars computes the per-column aggregations in parallel, which matters on wide survey files
+    try:
+        return pl.from_pandas(numeric).describe().to_pandas().set_index('statistic').to_string()
+    except (pl.exceptions.PolarsError, TypeError, ValueError):
+        return numeric.describe().to_string()
+
+def describe_frame(df: pd.DataFrame) -> str:
+    # Numeric columns get mean/std/percentiles; text and categorical columns get pandas'
+    # count/unique/top/freq, which says more about survey answers than lexicographic min/max
+    numeric = df.select_dtypes(include='number')
+    other = df.drop(columns=numeric.columns)
+    summaries = []
+    if not numeric.empty:
+        summaries.append(_describe_numeric(numeric))
+    if not other.empty:
+        summaries.append(other.describe().to_string())
+    return "\n\n".join(summaries)
+
+def fast_df_hash(df: pd.DataFrame) -> str:
+    # Text columns are hashed as integer codes plus their (small) set of distinct values, so the
+    # per-row work is over contiguous integer buffers instead of Python string objects. Computed
+    # once per upload by main() and passed to the analyzers.
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(df.columns), df.shape)).encode())
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+        elif pd.api.types.is_numeric_dtype(column.dtype):
+            digest.update(pd.util.hash_pandas_object(column, index=False).values.tobytes())
+            continue
+        else:
+            codes, uniques = pd.factorize(column)
+        digest.update(pd.util.hash_pandas_object(pd.Index(uniques).astype(str), index=False).values.tobytes())
+        digest.update(pd.util.hash_array(codes).tobytes())
+    return digest.hexdigest()
+
+SUMMARY_TMPL = """Dataset Summary:
+Columns: {columns}
+Total Rows: {rows}
+
+Statistical Summary:
+{statistics}
+
+Sample Data:
+{sample}"""
+
+@st.cache_data(max_entries=64, ttl=3600)
+def build_dataset_summary(_df: pd.DataFrame, df_hash: str) -> str:
+    # Memoized on df_hash so describe()/head() only run once per dataset rather than on every
+    # rerun, without Streamlit hashing the whole frame itself
+    summary_columns = select_summary_columns(_df)
+    return SUMMARY_TMPL.format_map({
+        'columns': ', '.join(map(str, _df.columns)),
+        'rows': len(_df),
+        'statistics': describe_frame(_df[summary_columns]),
+        'sample': _df[summary_columns].head(SAMPLE_ROWS).to_string(),
+    })
+
+class DataAnalyzer:
+    PROMPT_TMPL = """You are a data analyst examining political survey data. Here's the context:
 
 {df_info}
 
-Additional Context: {context if context else 'No additional context provided'}
+Additional Context: {context}
 
-Question: {question}
+{questions}
 
 Please provide a detailed analysis that includes:
-1. Direct answers to the specific question
+1. {answers}
 2. Relevant statistical insights
 3. Notable patterns or trends
 4. Important demographic variations
@@ -78,24 +376,388 @@ Please provide a detailed analysis that includes:
 
 Format your response in a clear, structured manner using markdown formatting."""
 
-        return prompt
+    def __init__(self, df: pd.DataFrame, llm_provider: LLMProvider, df_hash: str = None):
+        self.df = df
+        self.df_hash = df_hash or fast_df_hash(df)
+        self.llm_provider = llm_provider
+    
+    def generate_analysis_prompt(self, questions: Union[str, List[str]], context: str = None) -> str:
+        return self.PROMPT_TMPL.format_map({
+            'df_info': build_dataset_summary(self.df, self.df_hash),
+            'context': context if context else 'No additional context provided',
+            'questions': self._format_questions(questions),
+            'answers': ("Direct answers to the specific question" if isinstance(questions, str)
+                        else "Direct answers to each question, under its own heading"),
+        })
+
+    @staticmethod
+    def _format_questions(questions: Union[str, List[str]]) -> str:
+        if isinstance(questions, str):
+            return f"Question: {questions}"
+        
+        numbered = "\n".join(f"Q{i}. {q}" for i, q in enumerate(questions, start=1))
+        return (f"Answer each of the following questions, starting each answer with a markdown "
+                f"heading of the form '## Q<number>' (Q1 to Q{len(questions)}):\n{numbered}")
+
+    @staticmethod
+    def split_sections(response: str, count: int) -> List[str]:
+        # Split a batched response on its '## Qn' headings; returns an empty list if the
+        # model did not label every answer so the caller can fall back to the raw text
+        matches = list(re.finditer(r"^#{1,6}\s*\**\s*Q(\d+)\b.*$", response, flags=re.MULTILINE))
+        sections = {}
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+            sections.setdefault(int(match.group(1)), response[match.end():end].strip())
+        
+        if not all(n in sections for n in range(1, count + 1)):
+            return []
+        return [sections[n] for n in range(1, count + 1)]
 
     def analyze(self, question: str, context: str = None) -> str:
         prompt = self.generate_analysis_prompt(question, context)
         return self.llm_provider.generate_response(prompt)
 
+    def analyze_stream(self, question: str, context: str = None) -> Iterator[str]:
+        prompt = self.generate_analysis_prompt(question, context)
+        return self.llm_provider.generate_response_stream(prompt)
+
+    def analyze_batch(self, questions: List[str], context: str = None) -> str:
+        # One request for all questions so the dataset context is only sent (and prefilled) once
+        prompt = self.generate_analysis_prompt(questions, context)
+        return self.llm_provider.generate_response(prompt)
+
+_ASYNC_LOOP = None
+_ASYNC_LOOP_LOCK = threading.Lock()
+
+# Upper bound on each concurrent analysis, so a hung provider cannot block the script thread forever
+ANALYSIS_TIMEOUT = 330.0
+
+def run_coroutine(coro, timeout: float = None):
+    # Async SDK clients (e.g. Gemini's grpc.aio client, cached along with the model) are bound to
+    # the event loop they were first used on, so all fan-outs share one long-lived loop rather than
+    # a fresh asyncio.run() loop per click
+    global _ASYNC_LOOP
+    with _ASYNC_LOOP_LOCK:
+        if _ASYNC_LOOP is None:
+            _ASYNC_LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_ASYNC_LOOP.run_forever, daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coro, _ASYNC_LOOP)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise LLMProviderError(f"No response within {timeout:.0f} seconds")
+
+class MultiAnalyzer:
+    def __init__(self, df: pd.DataFrame, llm_provider: LLMProvider, df_hash: str = None):
+        self.analyzer = DataAnalyzer(df, llm_provider, df_hash)
+        self.llm_provider = llm_provider
+    
+    async def _analyze_one(self, prompt: str) -> str:
+        try:
+            return await asyncio.wait_for(self.llm_provider.generate_response_async(prompt), ANALYSIS_TIMEOUT)
+        except asyncio.TimeoutError as e:
+            raise LLMProviderError(f"No response within {ANALYSIS_TIMEOUT:.0f} seconds") from e
+
+    async def _analyze_all(self, questions: List[str], context: str = None) -> list:
+        prompts = [self.analyzer.generate_analysis_prompt(q, context) for q in questions]
+        return await asyncio.gather(*[self._analyze_one(p) for p in prompts], return_exceptions=True)
+
+    def analyze_all(self, questions: List[str], context: str = None) -> List[str]:
+        # Dispatch every question concurrently so the total wait is the slowest call, not the sum.
+        # Each call already times out on its own; the outer limit is only a backstop
+        try:
+            results = run_coroutine(self._analyze_all(questions, context), ANALYSIS_TIMEOUT + 30)
+        except LLMProviderError as e:
+            st.error(str(e))
+            return [None] * len(questions)
+        
+        # Errors are reported here, on the script thread, rather than from the event loop thread
+        errors = [str(r) for r in results if isinstance(r, Exception)]
+        for message in dict.fromkeys(errors):
+            st.error(message)
+        return [None if isinstance(r, Exception) else r for r in results]
+
+def _agg_support_numpy(gender_codes: np.ndarray, party_codes: np.ndarray, support: np.ndarray,
+                       n_genders: int, n_parties: int) -> Tuple[np.ndarray, ...]:
+    valid = (gender_codes >= 0) & (party_codes >= 0) & ~np.isnan(support)
+    flat = gender_codes[valid].astype(np.int64) * n_parties + party_codes[valid]
+    values = support[valid]
+    size = n_genders * n_parties
+    sums = np.bincount(flat, weights=values, minlength=size)
+    counts = np.bincount(flat, minlength=size).astype(np.float64)
+    mins = np.full(size, np.inf)
+    maxs = np.full(size, -np.inf)
+    np.minimum.at(mins, flat, values)
+    np.maximum.at(maxs, flat, values)
+    shape = (n_genders, n_parties)
+    return sums.reshape(shape), counts.reshape(shape), mins.reshape(shape), maxs.reshape(shape)
+
+# Below this many rows the NumPy path is already sub-millisecond and Numba's import and JIT
+# compile would only add latency
+NUMBA_MIN_ROWS = 1_000_000
+
+@functools.lru_cache(maxsize=1)
+def _get_numba_kernel():
+    # numba is optional and imported on first use so it never slows down app start-up
+    try:
+        import numba
+    except ImportError:
+        return None
+    
+    @numba.njit(parallel=True, cache=True)
+    def _agg_support_numba(gender_codes, party_codes, support, n_genders, n_parties, n_chunks):
+        # Each thread accumulates its own slice of rows into a private grid, merged at the end
+        n_rows = support.shape[0]
+        step = (n_rows + n_chunks - 1) // n_chunks
+        partial_sums = np.zeros((n_chunks, n_genders, n_parties))
+        partial_counts = np.zeros((n_chunks, n_genders, n_parties))
+        partial_mins = np.full((n_chunks, n_genders, n_parties), np.inf)
+        partial_maxs = np.full((n_chunks, n_genders, n_parties), -np.inf)
+        for c in numba.prange(n_chunks):
+            for i in range(c * step, min(n_rows, (c + 1) * step)):
+                g = gender_codes[i]
+                p = party_codes[i]
+                value = support[i]
+                if g >= 0 and p >= 0 and not np.isnan(value):
+                    partial_sums[c, g, p] += value
+                    partial_counts[c, g, p] += 1.0
+                    partial_mins[c, g, p] = min(partial_mins[c, g, p], value)
+                    partial_maxs[c, g, p] = max(partial_maxs[c, g, p], value)
+        
+        sums = np.zeros((n_genders, n_parties))
+        counts = np.zeros((n_genders, n_parties))
+        mins = np.full((n_genders, n_parties), np.inf)
+        maxs = np.full((n_genders, n_parties), -np.inf)
+        for c in range(n_chunks):
+            sums += partial_sums[c]
+            counts += partial_counts[c]
+            mins = np.minimum(mins, partial_mins[c])
+            maxs = np.maximum(maxs, partial_maxs[c])
+        return sums, counts, mins, maxs
+    
+    return lambda *args: _agg_support_numba(*args, numba.get_num_threads())
+
+def agg_support(gender_codes: np.ndarray, party_codes: np.ndarray, support: np.ndarray,
+                n_genders: int, n_parties: int) -> Tuple[np.ndarray, ...]:
+    # Returns (sums, counts, mins, maxs) of support per (gender, party) code; rows with missing
+    # values are skipped
+    kernel = _get_numba_kernel() if len(support) >= NUMBA_MIN_ROWS else None
+    if kernel is None:
+        return _agg_support_numpy(gender_codes, party_codes, support, n_genders, n_parties)
+    return kernel(gender_codes, party_codes, support, n_genders, n_parties)
+
 class Visualizer:
     @staticmethod
     def create_visualization(df: pd.DataFrame, analysis_type: str):
         if analysis_type == "gender_distribution":
-            fig = px.bar(df, x='Gender', y='Support', color='Party',
-                        barmode='group', title='Party Support by Gender')
+            import plotly.graph_objects as go
+            
+            # Aggregate up front in a single pass over integer codes so plotly builds one bar
+            # per (Gender, Party) instead of scanning raw rows
+            gender = pd.Categorical(df['Gender'])
+            party = pd.Categorical(df['Party'])
+            support = np.ascontiguousarray(df['Support'].to_numpy(dtype=np.float64))
+            sums, counts, mins, maxs = agg_support(gender.codes, party.codes, support,
+                                                   len(gender.categories), len(party.categories))
+            
+            # Only O(#groups) points reach plotly; the min/max per bucket is kept in the hover
+            # so the spread of the underlying responses isn't lost
+            fig = go.Figure()
+            for p, party_name in enumerate(party.categories):
+                present = counts[:, p] > 0
+                if present.any():
+                    fig.add_trace(go.Bar(
+                        x=np.asarray(gender.categories)[present],
+                        y=sums[present, p] / counts[present, p],
+                        customdata=np.column_stack([mins[present, p], maxs[present, p], counts[present, p]]),
+                        hovertemplate="%{x}: %{y:.2f} (min %{customdata[0]:.2f}, "
+                                      "max %{customdata[1]:.2f}, n=%{customdata[2]:.0f})",
+                        name=str(party_name)
+                    ))
+            fig.update_layout(barmode='group', title='Party Support by Gender',
+                              xaxis_title='Gender', yaxis_title='Support', legend_title_text='Party')
             return fig
         return None
 
+class ResponseCache:
+    def __init__(self, ttl: float = 3600, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(prompt: str, provider_key: tuple) -> tuple:
+        # provider_key is (provider, model, api_key_hash), so answers are never shared across models or keys
+        return (hashlib.blake2b(prompt.encode()).hexdigest(), *provider_key)
+    
+    def get(self, key: tuple) -> str:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, response = entry
+            if time.monotonic() - created > self.ttl:
+                del self._entries[key]
+                return None
+            return response
+    
+    def put(self, key: tuple, response: str):
+        # Callers only store answers whose stream finished normally; truncated ones are never cached
+        with self._lock:
+            now = time.monotonic()
+            self._entries.pop(key, None)
+            self._entries[key] = (now, response)
+            
+            # The cache is shared by every session, so drop expired entries and then the oldest
+            # ones (dicts keep insertion order) to stay within max_entries
+            for stale in [k for k, (created, _) in self._entries.items() if now - created > self.ttl]:
+                del self._entries[stale]
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    # Shared across sessions; holds completed answers so repeat prompts skip the LLM entirely
+    return ResponseCache(ttl=3600, max_entries=256)
+
+class AnalysisJob:
+    def __init__(self, stream: Iterator[str], cache_key: tuple, analysis_type: str, file_id: str):
+        self.stream = stream
+        self.cache_key = cache_key
+        self.analysis_type = analysis_type
+        self.file_id = file_id
+        # Appended to by the worker; joined only when the fragment polls (every 0.5s), which is what
+        # batches tokens on their way to the browser
+        self.chunks = []
+        self.error = None
+        self.completed = False
+        self.cancelled = False
+        self.future = None
+    
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+    
+    def run(self) -> str:
+        # Runs on the worker thread, so it never calls st.*; failures are recorded on the job and
+        # rendered by the script thread
+        try:
+            for chunk in self.stream:
+                if self.cancelled:
+                    break
+                self.chunks.append(chunk)
+            else:
+                # A stream closed by cancel() also ends without error, so check the flag too
+                self.completed = not self.cancelled
+        except Exception as e:
+            # A read aborted by cancel() fails too; that is not an error worth showing
+            if not self.cancelled:
+                self.error = str(e)
+        finally:
+            self.stream.close()
+        return self.text
+    
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+        try:
+            # Closes the provider's HTTP stream right away. Provider streams such as OllamaStream abort
+            # a blocked read themselves; a plain generator that is mid-chunk raises here and the
+            # worker closes it after the next chunk instead
+            self.stream.close()
+        except ValueError:
+            pass
+
+def start_analysis_job(job: AnalysisJob):
+    # The LLM call runs on the session's worker thread so the script thread is free to handle widget events
+    if st.session_state.analysis_job is not None:
+        st.session_state.analysis_job.cancel()
+    job.future = st.session_state.executor.submit(job.run)
+    st.session_state.analysis_job = job
+    st.session_state.analysis_result = None
+
+@st.fragment(run_every=0.5)
+def render_analysis_progress():
+    job = st.session_state.analysis_job
+    if job is None:
+        return
+    
+    if job.future.done():
+        st.session_state.analysis_job = None
+        if job.completed:
+            get_response_cache().put(job.cache_key, job.text)
+        st.session_state.analysis_result = {
+            'analysis': job.text,
+            'error': job.error,
+            'analysis_type': job.analysis_type,
+            'file_id': job.file_id
+        }
+        # Rerun the whole app so the finished result is rendered with its chart and download button
+        st.rerun()
+    
+    st.subheader("Analysis Results")
+    st.info("Analyzing data...")
+    st.markdown(job.text)
+
+def render_analysis_result(df: pd.DataFrame, result: dict):
+    st.subheader("Analysis Results")
+    analysis = result.get('analysis')
+    if result.get('error'):
+        st.error(result['error'])
+        if analysis:
+            st.caption("Partial response received before the error:")
+            st.markdown(analysis)
+        return
+    
+    if not analysis:
+        st.warning("No response was received from the AI provider")
+        return
+    
+    st.markdown(analysis)
+    if result['analysis_type'] == "Gender-based Analysis":
+        try:
+            fig = Visualizer.create_visualization(df, "gender_distribution")
+            if fig:
+                st.plotly_chart(fig)
+        except Exception as e:
+            st.warning("Could not create visualization with the current data format")
+    
+    st.download_button(
+        label="Download Analysis",
+        data=analysis,
+        file_name="political_analysis.txt",
+        mime="text/plain"
+    )
+
 def initialize_session_state():
     if 'gemini_api_key' not in st.session_state:
         st.session_state.gemini_api_key = ""
+    if 'llm_provider' not in st.session_state:
+        st.session_state.llm_provider = None
+        st.session_state.llm_provider_key = None
+    if 'executor' not in st.session_state:
+        st.session_state.executor = ThreadPoolExecutor(max_workers=1)
+        st.session_state.analysis_job = None
+        st.session_state.analysis_result = None
+
+def get_provider(provider: str, model: str = None, api_key: str = None) -> LLMProvider:
+    # Providers are reused across reruns until the selection or API key changes
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    cache_key = (provider, model, key_hash)
+    
+    if st.session_state.llm_provider_key != cache_key:
+        if st.session_state.llm_provider is not None:
+            st.session_state.llm_provider.close()
+        if provider == "Ollama":
+            st.session_state.llm_provider = OllamaProvider(model)
+        else:
+            st.session_state.llm_provider = GeminiProvider(api_key)
+        st.session_state.llm_provider_key = cache_key
+    
+    return st.session_state.llm_provider
 
 def render_sidebar():
     st.sidebar.header("Configuration")
@@ -132,7 +794,18 @@ def main():
     
     if uploaded_file is not None:
         try:
-            df = pd.DataFrame(pd.read_csv(uploaded_file))
+            # Keep the parsed frame in the session so reruns reuse it instead of copying it out of the cache
+            if st.session_state.get('df_file_id') != uploaded_file.file_id:
+                st.session_state.df = load_csv(uploaded_file)
+                st.session_state.df_hash = fast_df_hash(st.session_state.df)
+                st.session_state.df_file_id = uploaded_file.file_id
+            # A job still running for a previously uploaded file is not wanted any more
+            job = st.session_state.analysis_job
+            if job is not None and job.file_id != uploaded_file.file_id:
+                job.cancel()
+                st.session_state.analysis_job = None
+            df = st.session_state.df
+            df_hash = st.session_state.df_hash
             
             st.subheader("Dataset Preview")
             st.dataframe(df.head())
@@ -160,39 +833,80 @@ def main():
                                   height=100,
                                   placeholder="Example: What is the correlation between gender and party support?"))
             
-            if st.button("Analyze"):
+            col_analyze, col_run_all = st.columns(2)
+            analyze_clicked = col_analyze.button("Analyze")
+            run_all_clicked = col_run_all.button("Run all analyses")
+            single_request = col_run_all.checkbox(
+                "Answer all questions in a single request",
+                value=True,
+                help="Sends the dataset summary once instead of once per analysis"
+            )
+            
+            if analyze_clicked or run_all_clicked:
                 # Initialize appropriate LLM provider
                 if provider == "Ollama":
-                    llm_provider = OllamaProvider(model)
+                    llm_provider = get_provider(provider, model)
                 else:
                     if not st.session_state.gemini_api_key:
                         st.error("Please enter your Gemini API key in the sidebar")
                         return
-                    llm_provider = GeminiProvider(st.session_state.gemini_api_key)
+                    llm_provider = get_provider(provider, api_key=st.session_state.gemini_api_key)
+            
+            if run_all_clicked:
+                sections = questions
+                with st.spinner("Running all analyses..."):
+                    if single_request:
+                        response = DataAnalyzer(df, llm_provider, df_hash).analyze_batch(list(questions.values()), context)
+                        results = DataAnalyzer.split_sections(response or "", len(questions))
+                        if response and not results:
+                            # Model ignored the Qn labels; show the combined answer as-is
+                            sections, results = ["All Analyses"], [response]
+                    else:
+                        multi_analyzer = MultiAnalyzer(df, llm_provider, df_hash)
+                        results = multi_analyzer.analyze_all(list(questions.values()), context)
                 
-                with st.spinner("Analyzing data..."):
-                    analyzer = DataAnalyzer(df, llm_provider)
-                    analysis = analyzer.analyze(question, context)
-                    
+                st.subheader("Analysis Results")
+                report = ""
+                for name, analysis in zip(sections, results):
                     if analysis:
-                        st.subheader("Analysis Results")
+                        st.markdown(f"### {name}")
                         st.markdown(analysis)
-                        
-                        if analysis_type == "Gender-based Analysis":
-                            try:
-                                fig = Visualizer.create_visualization(df, "gender_distribution")
-                                if fig:
-                                    st.plotly_chart(fig)
-                            except Exception as e:
-                                st.warning("Could not create visualization with the current data format")
-                        
-                        st.download_button(
-                            label="Download Analysis",
-                            data=analysis,
-                            file_name="political_analysis.txt",
-                            mime="text/plain"
-                        )
-                        
+                        report += f"# {name}\n\n{analysis}\n\n"
+                
+                if report:
+                    st.download_button(
+                        label="Download Analysis",
+                        data=report,
+                        file_name="political_analysis.txt",
+                        mime="text/plain"
+                    )
+            
+            else:
+                if analyze_clicked:
+                    analyzer = DataAnalyzer(df, llm_provider, df_hash)
+                    prompt = analyzer.generate_analysis_prompt(question, context)
+                    cache_key = ResponseCache.make_key(prompt, st.session_state.llm_provider_key)
+                    
+                    analysis = get_response_cache().get(cache_key)
+                    if analysis:
+                        if st.session_state.analysis_job is not None:
+                            st.session_state.analysis_job.cancel()
+                            st.session_state.analysis_job = None
+                        st.session_state.analysis_result = {
+                            'analysis': analysis,
+                            'analysis_type': analysis_type,
+                            'file_id': uploaded_file.file_id
+                        }
+                    else:
+                        start_analysis_job(AnalysisJob(llm_provider.generate_response_stream(prompt),
+                                                       cache_key, analysis_type, uploaded_file.file_id))
+                
+                result = st.session_state.analysis_result
+                if st.session_state.analysis_job is not None:
+                    render_analysis_progress()
+                elif result and result['file_id'] == uploaded_file.file_id:
+                    render_analysis_result(df, result)
+                    
         except Exception as e:
             st.error(f"Error processing the file: {str(e)}")
             
@@ -0,0 +1,154 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+
+def tokens(*chunks, error=None, closed=None):
+    try:
+        for chunk in chunks:
+            yield chunk
+        if error:
+            raise app.LLMProviderError(error)
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+def make_job(stream):
+    return app.AnalysisJob(stream, ("key",), "Custom Query", "file-1")
+
+
+def test_job_collects_stream_and_marks_completed():
+    job = make_job(tokens("Hello ", "world"))
+    assert job.run() == "Hello world"
+    assert job.completed
+    assert job.error is None
+
+
+def test_job_records_provider_error_without_completing():
+    job = make_job(tokens("partial", error="Ollama returned an error: boom"))
+    job.run()
+    assert job.text == "partial"
+    assert job.error == "Ollama returned an error: boom"
+    assert not job.completed
+
+
+def test_cancel_closes_the_stream():
+    closed = []
+    stream = tokens("a", "b", closed=closed)
+    next(stream)
+    job = make_job(stream)
+    job.cancel()
+    assert closed == [True]
+    job.run()
+    assert job.cancelled
+    assert not job.completed
+
+
+class SlowPrefillHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # Headers are sent but no tokens arrive, like Ollama during a long prefill
+        time.sleep(3)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_cancel_aborts_a_blocked_ollama_read():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowPrefillHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        provider = app.OllamaProvider()
+        provider.url = f"http://127.0.0.1:{server.server_port}/api/generate"
+        job = make_job(provider.generate_response_stream("prompt"))
+        worker = threading.Thread(target=job.run)
+        started = time.monotonic()
+        worker.start()
+        time.sleep(0.3)
+        job.cancel()
+        worker.join(timeout=2)
+        assert not worker.is_alive()
+        assert time.monotonic() - started < 1.5
+        assert job.cancelled
+        assert job.error is None
+        assert not job.completed
+    finally:
+        server.shutdown()
+
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+import app
+
+class FakeProvider(app.LLMProvider):
+    def generate_response(self, prompt):
+        return None
+
+    def generate_response_stream(self, prompt):
+        yield "Answer "
+        yield "text"
+        if {error!r}:
+            raise app.LLMProviderError({error!r})
+
+rec = UploadedFileRec(file_id="f1", name="s.csv", type="text/csv",
+                      data=b"Gender,Party,Support\\nMale,A,10\\nFemale,B,20\\n")
+st.file_uploader = lambda *args, **kwargs: UploadedFile(rec, None)
+def get_provider(*args, **kwargs):
+    st.session_state.llm_provider_key = ("Fake", None, None)
+    return FakeProvider()
+
+app.get_provider = get_provider
+app.main()
+"""
+
+
+def by_label(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def run_analysis(error=None):
+    app.get_response_cache.clear()
+    at = AppTest.from_string(SCRIPT.format(root=str(ROOT), error=error), default_timeout=30).run()
+    by_label(at.selectbox, "Select Analysis Type").select("Custom Query").run()
+    by_label(at.text_area, "Enter your specific analysis question").input("What drives support?").run()
+    by_label(at.button, "Analyze").click().run()
+    for _ in range(20):
+        if at.session_state.analysis_job is None:
+            break
+        time.sleep(0.1)
+        at.run()
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_analysis_runs_in_background_and_renders_result():
+    at = run_analysis()
+    assert "Answer text" in [m.value for m in at.markdown]
+    assert at.session_state.analysis_result["error"] is None
+
+
+def test_provider_error_is_rendered_and_not_cached():
+    at = run_analysis(error="Error connecting to Ollama: connection refused")
+    assert "Error connecting to Ollama: connection refused" in [e.value for e in at.error]
+    assert "Answer text" in [m.value for m in at.markdown]
+    assert not app.get_response_cache()._entries
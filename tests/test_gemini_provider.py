@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app  # noqa: E402
+
+
+def credentials_token(client):
+    return client._transport._credentials.token
+
+
+def test_models_are_bound_to_their_own_key():
+    first = app.GeminiProvider("key-a")
+    second = app.GeminiProvider("key-b")
+    assert credentials_token(first.model._client) == "key-a"
+    assert credentials_token(second.model._client) == "key-b"
+    assert app.GeminiProvider("key-a").model is first.model
+
+
+def stream_of(*responses):
+    from google.generativeai.types import generation_types
+
+    class FakeModel:
+        def generate_content(self, prompt, stream):
+            return [generation_types.GenerateContentResponse.from_response(r) for r in responses]
+
+    provider = app.GeminiProvider.__new__(app.GeminiProvider)
+    provider.model = FakeModel()
+    return provider.generate_response_stream("prompt")
+
+
+def collect(stream):
+    received = []
+    with pytest.raises(app.LLMProviderError) as error:
+        for chunk in stream:
+            received.append(chunk)
+    return received, str(error.value)
+
+
+def test_blocked_prompt_is_reported():
+    import google.ai.generativelanguage as glm
+
+    blocked = glm.GenerateContentResponse(
+        prompt_feedback=glm.GenerateContentResponse.PromptFeedback(
+            block_reason=glm.GenerateContentResponse.PromptFeedback.BlockReason.SAFETY))
+    assert collect(stream_of(blocked)) == ([], "Gemini blocked the prompt: SAFETY")
+
+
+def test_safety_stop_after_partial_text_is_reported():
+    import google.ai.generativelanguage as glm
+
+    text = glm.GenerateContentResponse(candidates=[
+        glm.Candidate(content=glm.Content(parts=[glm.Part(text="Partial ")]))])
+    stopped = glm.GenerateContentResponse(candidates=[
+        glm.Candidate(finish_reason=glm.Candidate.FinishReason.SAFETY)])
+    assert collect(stream_of(text, stopped)) == (["Partial "], "Gemini stopped the response: SAFETY")
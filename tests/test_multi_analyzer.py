@@ -0,0 +1,27 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+
+class HangingProvider(app.LLMProvider):
+    def generate_response(self, prompt):
+        return None
+
+    async def generate_response_async(self, prompt):
+        if "slow" in prompt:
+            await asyncio.sleep(60)
+        return "fast answer"
+
+
+def test_hung_call_times_out_without_losing_the_others(monkeypatch):
+    monkeypatch.setattr(app, "ANALYSIS_TIMEOUT", 0.2)
+    df = pd.DataFrame({"Gender": ["Male", "Female"], "Party": ["A", "B"], "Support": [1.0, 2.0]})
+    results = app.MultiAnalyzer(df, HangingProvider()).analyze_all(["quick question", "slow question"])
+    assert results == ["fast answer", None]
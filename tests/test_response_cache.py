@@ -0,0 +1,24 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app  # noqa: E402
+
+
+def test_put_evicts_oldest_entries_beyond_max_entries():
+    cache = app.ResponseCache(ttl=3600, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put((key,), key)
+    assert cache.get(("a",)) is None
+    assert cache.get(("b",)) == "b"
+    assert cache.get(("c",)) == "c"
+
+
+def test_put_prunes_expired_entries():
+    cache = app.ResponseCache(ttl=0, max_entries=10)
+    cache.put(("a",), "a")
+    time.sleep(0.01)
+    cache.put(("b",), "b")
+    assert list(cache._entries) == [("b",)]